@@ -2,8 +2,8 @@ from argparse import ArgumentParser
 import asyncio
 import logging
 import grp
+import os
 import pwd
-import re
 import pyfuse3
 import pyfuse3_asyncio
 from rdmfs import fs, whitelist
@@ -60,36 +60,39 @@ def parse_args():
     return parser.parse_args()
 
 def parse_mode(mode):
-    m = re.match(r'^0([0-9]+)$', mode)
-    if not m:
+    if not (mode.startswith('0') and mode[1:].isascii() and mode[1:].isdigit()):
         raise ValueError(f'Unexpected mode: {mode}')
-    return int(m.group(1), 8)
+    return int(mode[1:], 8)
 
 def parse_uid(uid):
-    if uid is None:
-        return uid
-    m = re.match(r'^([0-9]+)$', uid)
-    if m:
+    if uid.isascii() and uid.isdigit():
         return int(uid)
     return pwd.getpwnam(uid).pw_uid
 
 def parse_gid(gid):
-    if gid is None:
-        return gid
-    m = re.match(r'^([0-9]+)$', gid)
-    if m:
+    if gid.isascii() and gid.isdigit():
         return int(gid)
     return grp.getgrnam(gid).gr_gid
 
+def enable_uvloop():
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
 def main():
     options = parse_args()
     init_logging(options.debug)
+    if enable_uvloop():
+        logging.getLogger(__name__).info('Using uvloop event loop')
 
     osf = cli._setup_osf(options)
     file_mode = parse_mode(options.file_mode)
     dir_mode = parse_mode(options.dir_mode)
-    uid = parse_uid(options.owner)
-    gid = parse_gid(options.group)
+    uid = parse_uid(options.owner) if options.owner is not None else os.getuid()
+    gid = parse_gid(options.group) if options.group is not None else os.getgid()
     writable_whitelist = None
     if options.writable_whitelist is not None:
         with open(options.writable_whitelist, 'r') as f:
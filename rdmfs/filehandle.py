@@ -1,28 +1,30 @@
+import heapq
 import logging
-import sys
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 log = logging.getLogger(__name__)
 
 class FileHandlers:
     file_handlers: Dict[int, Any]
     offset_fh: int
+    _next_fh: int
+    _free_fhs: List[int]
 
     def __init__(self):
         self.file_handlers = {}
         self.offset_fh = 1
+        self._next_fh = self.offset_fh
+        self._free_fhs = []
 
     def find_node_by_fh(self, fh):
         return self.file_handlers[fh]
 
     def get_node_fh(self, node) -> int:
-        new_fh = None
-        for fh in range(self.offset_fh, sys.maxsize):
-            if fh not in self.file_handlers:
-                new_fh = fh
-                break
-        if new_fh is None:
-            raise ValueError('Cannot allocate new handler')
+        if self._free_fhs:
+            new_fh = heapq.heappop(self._free_fhs)
+        else:
+            new_fh = self._next_fh
+            self._next_fh += 1
         self.file_handlers[new_fh] = node
         return new_fh
 
@@ -30,3 +32,4 @@ class FileHandlers:
         if fh not in self.file_handlers:
             return
         del self.file_handlers[fh]
+        heapq.heappush(self._free_fhs, fh)
@@ -24,8 +24,8 @@ class RDMFileSystem(pyfuse3.Operations):
         self.file_handlers = FileHandlers()
         self.dir_mode = dir_mode
         self.file_mode = file_mode
-        self.uid = uid or os.getuid()
-        self.gid = gid or os.getgid()
+        self.uid = uid if uid is not None else os.getuid()
+        self.gid = gid if gid is not None else os.getgid()
         self.writable_whitelist = writable_whitelist
 
     async def getattr(self, inode_num, ctx=None):
@@ -184,8 +184,8 @@ class RDMFileSystem(pyfuse3.Operations):
             entry.st_atime_ns = stamp
             entry.st_ctime_ns = stamp
             entry.st_mtime_ns = mstamp
-            entry.st_gid = os.getgid()
-            entry.st_uid = os.getuid()
+            entry.st_gid = self.gid
+            entry.st_uid = self.uid
             entry.st_ino = inode.id
             entry.entry_timeout = 5
             entry.attr_timeout = 5
@@ -275,6 +275,7 @@ class RDMFileSystem(pyfuse3.Operations):
             if not inode.can_create:
                 raise pyfuse3.FUSEError(errno.EACCES)
             new_folder = await inode.object.create_folder(sname)
+            self.inodes.invalidate(inode)
             new_attr = await self.lookup(parent_inode_num, name)
             log.info('mkdir: folder={}, attr={}'.format(new_folder, new_attr))
             return new_attr
@@ -308,7 +309,7 @@ class RDMFileSystem(pyfuse3.Operations):
                 raise pyfuse3.FUSEError(errno.ENOTEMPTY)
             log.info('rmdir: folder={}'.format(target))
             await target.object.remove()
-            target.remove()
+            self.inodes.remove(target)
             self.inodes.invalidate(parent_inode)
         except pyfuse3.FUSEError as e:
             raise e
@@ -383,7 +384,7 @@ class RDMFileSystem(pyfuse3.Operations):
             log.info('unlink: file={}'.format(target))
             await target.refresh(self.inodes)
             await target.object.remove()
-            target.remove()
+            self.inodes.remove(target)
             self.inodes.invalidate(parent_inode)
         except pyfuse3.FUSEError as e:
             raise e
@@ -1,13 +1,14 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
 import json
-import sys
 import logging
 import errno
+import sys
 import time
-from typing import Optional, Union, List, Dict, AsyncGenerator, Any
+from typing import Optional, Union, List, Dict, Tuple, AsyncGenerator, Any
 
 import pyfuse3
-from cacheout import Cache
 from osfclient import OSF
 from osfclient.models import Storage, Project, File, Folder
 
@@ -15,20 +16,46 @@ from osfclient.models import Storage, Project, File, Folder
 log = logging.getLogger(__name__)
 FILE_ATTRIBUTE_CACHE_TTL = 60 # 1 minute
 LIST_CACHE_TTL = 180 # 3 minutes
+LIST_CACHE_SIZE = 256
+NEGATIVE_CACHE_TTL = 10 # 10 seconds
+NEGATIVE_CACHE_SIZE = 1024
+TIMESTAMP_CACHE_SIZE = 4096
+
+# Parsed timestamps: the same date strings are converted on every getattr
+_ts_cache: Dict[str, int] = {}
 
 
 def fromisoformat(datestr):
-    datestr = datestr.replace('Z', '+00:00')
-    return int(datetime.fromisoformat(datestr).timestamp() * 1e9)
+    ts = _ts_cache.get(datestr)
+    if ts is not None:
+        return ts
+    if len(_ts_cache) >= TIMESTAMP_CACHE_SIZE:
+        _ts_cache.clear()
+    ts = int(datetime.fromisoformat(datestr.replace('Z', '+00:00')).timestamp() * 1e9)
+    _ts_cache[datestr] = ts
+    return ts
+
+
+def get_size(object: Any) -> Optional[int]:
+    size = getattr(object, 'size', None)
+    if type(size) == int:
+        return size
+    if type(size) == str and size.isdigit():
+        return int(size)
+    return None
 
 
 class BaseInode:
     """The class for managing single inode."""
+    __slots__ = ('id', 'removed', '_cached_path', '_cached_display_path')
+
     def __init__(self, id: int):
         if not isinstance(id, int):
             raise ValueError('Invalid inode id: {}'.format(id))
         self.id = id
         self.removed = False
+        self._cached_path: Optional[str] = None
+        self._cached_display_path: Optional[str] = None
 
     def __str__(self) -> str:
         return f'<{self.__class__.__name__} [id={self.id}, path={self.path}]>'
@@ -42,6 +69,10 @@ class BaseInode:
     def remove(self):
         self.removed = True
 
+    def _clear_cached_paths(self):
+        self._cached_path = None
+        self._cached_display_path = None
+
     @property
     def parent(self) -> Optional['BaseInode']:
         raise NotImplementedError
@@ -65,6 +96,10 @@ class BaseInode:
     def has_children(self) -> bool:
         return False
 
+    async def iter_children(self) -> AsyncGenerator[Union[Storage, File, Folder], None]:
+        async for child in self.object.children:
+            yield child
+
     @property
     def date_created(self) -> Optional[str]:
         return None
@@ -79,7 +114,7 @@ class BaseInode:
 
     @property
     def display_path(self) -> str:
-        raise self.path
+        return self.path
 
     @property
     def can_create(self) -> bool:
@@ -92,9 +127,13 @@ class BaseInode:
 
 class ProjectInode(BaseInode):
     """The class for managing single project inode."""
+    __slots__ = ('project',)
+
     def __init__(self, id: int, project: Project):
         super(ProjectInode, self).__init__(id)
         self.project = project
+        self._cached_path = f'/{project.id}/'
+        self._cached_display_path = '/'
 
     @property
     def parent(self) -> Optional[BaseInode]:
@@ -115,21 +154,31 @@ class ProjectInode(BaseInode):
     def has_children(self):
         return True
 
+    async def iter_children(self) -> AsyncGenerator[Storage, None]:
+        async for storage in self.project.storages:
+            yield storage
+
     @property
     def path(self):
-        return f'/{self.project.id}/'
+        return self._cached_path
 
     @property
     def display_path(self):
-        return '/'
+        return self._cached_display_path
 
 
 class StorageInode(BaseInode):
     """The class for managing single storage inode."""
+    __slots__ = ('project', '_storage', '_name')
+
     def __init__(self, id: int, project: ProjectInode, storage: Storage):
         super(StorageInode, self).__init__(id)
         self.project = project
         self._storage = storage
+        # Storage names such as 'osfstorage' are shared by many objects
+        self._name = sys.intern(storage.name)
+        self._cached_path = f'{project.path}{self._name}/'
+        self._cached_display_path = f'{project.display_path}{self._name}/'
 
     @property
     def parent(self) -> Optional[BaseInode]:
@@ -145,18 +194,18 @@ class StorageInode(BaseInode):
 
     @property
     def name(self):
-        return self._storage.name
+        return self._name
 
     def has_children(self):
         return True
 
     @property
     def path(self):
-        return f'{self.parent.path}{self._storage.name}/'
+        return self._cached_path
 
     @property
     def display_path(self):
-        return f'{self.parent.display_path}{self._storage.name}/'
+        return self._cached_display_path
 
     @property
     def can_create(self):
@@ -165,9 +214,16 @@ class StorageInode(BaseInode):
 
 class BaseFileInode(BaseInode):
     """The class for managing single file inode."""
+    __slots__ = (
+        '_parent', '_updated', '_last_loaded', '_updated_name',
+        '_cached_parent_display_path', '_cached_size', '_is_new',
+    )
     _updated: Optional[Union[File, Folder]]
     _last_loaded: float
     _updated_name: Optional[str]
+    _cached_parent_display_path: Optional[str]
+    _cached_size: Optional[int]
+    _is_new: bool
 
     def __init__(
         self,
@@ -177,30 +233,49 @@ class BaseFileInode(BaseInode):
         super(BaseFileInode, self).__init__(id)
         self._parent = parent
         self._updated = None
-        self._last_loaded = time.time()
+        self._last_loaded = time.monotonic()
         self._updated_name = None
+        self._cached_parent_display_path = None
+        self._cached_size = None
+        self._is_new = False
 
     def invalidate(self, name: Optional[str] = None):
         self._last_loaded = None
         self._updated_name = name
+        self._cached_size = None
+        self._clear_cached_paths()
 
     def set_parent(self, parent: BaseInode):
         self._parent = parent
+        self._clear_cached_paths()
 
     async def refresh(self, context: 'Inodes', force=False):
-        expired = self._last_loaded is None or \
-            time.time() - self._last_loaded > FILE_ATTRIBUTE_CACHE_TTL
-        if not force and not self._is_new_file and not expired:
-            return
-        child = await self._get_child_by_name(self.name)
+        now = time.monotonic()
+        if not force and not self._is_new:
+            last_loaded = self._last_loaded
+            if last_loaded is not None and now - last_loaded <= FILE_ATTRIBUTE_CACHE_TTL:
+                return
+        # An invalidated inode may have changed after the parent was listed
+        use_cache = not force and self._last_loaded is not None
+        child = await self._get_child(context, self.name, self._path, use_cache=use_cache)
         if child is None:
-            child = await self._get_child_by_path(self._path)
-            if child is None:
-                raise pyfuse3.FUSEError(errno.ENOENT)
+            raise pyfuse3.FUSEError(errno.ENOENT)
         self._validate(child)
-        self._updated = child
+        self._set_latest(context, child, loaded_at=now)
+
+    def _set_latest(
+        self,
+        context: 'Inodes',
+        object: Union[File, Folder],
+        loaded_at: Optional[float] = None,
+    ):
+        """Replace the object with the latest one loaded from GRDM."""
+        self._updated = object
         self._updated_name = None
-        self._last_loaded = time.time()
+        self._last_loaded = loaded_at if loaded_at is not None else time.monotonic()
+        self._cached_size = get_size(object)
+        self._clear_cached_paths()
+        context.update_path(self)
 
     @property
     def parent(self) -> Optional[BaseInode]:
@@ -236,8 +311,18 @@ class BaseFileInode(BaseInode):
 
     @property
     def path(self):
-        path = self._path if not self._path.startswith('/') else self._path[1:]
-        return f'{self.storage.path}{path}'
+        if self._cached_path is None:
+            self._cached_path = get_path_for(self._parent, self._latest)
+        return self._cached_path
+
+    def _get_display_path(self, suffix: str) -> str:
+        # The display path also depends on the parent, which may be renamed
+        parent_path = self.parent.display_path
+        if self._cached_display_path is None or \
+            self._cached_parent_display_path is not parent_path:
+            self._cached_display_path = f'{parent_path}{self.name}{suffix}'
+            self._cached_parent_display_path = parent_path
+        return self._cached_display_path
 
     @property
     def can_move(self):
@@ -252,31 +337,45 @@ class BaseFileInode(BaseInode):
 
     @property
     def _is_new_file(self) -> bool:
-        raise NotImplementedError
+        return self._is_new
 
     def _get_path(self, object: Any) -> str:
-        try:
-            return object.osf_path
-        except AttributeError:
-            return object.path
+        return get_object_path(object)
 
-    async def _get_child_by_name(self, name: str) -> Optional[Union[File, Folder]]:
+    async def _get_child(
+        self,
+        context: 'Inodes',
+        name: str,
+        path: str,
+        use_cache: bool = True,
+    ) -> Optional[Union[File, Folder]]:
+        """Find the child of the parent by name, or by path if no name matches."""
+        if use_cache:
+            # Use the listing of the parent if it is as fresh as the attribute cache
+            cache: Optional[ChildRelation] = context._cr_get(self._parent.id)
+            if cache is not None and \
+                time.monotonic() - cache.loaded_at <= FILE_ATTRIBUTE_CACHE_TTL:
+                child = cache.objects.get(name)
+                if child is not None:
+                    return child
+                for child in cache.objects.values():
+                    if self._get_path(child) == path:
+                        return child
+        # Both name and path are checked in a single listing
+        found = None
         async for child in self._parent.object.children:
-            log.debug(f'searching({name})... child: {child}, name: {child.name}, path: {child.path}')
+            log.debug(f'searching({name}, {path})... child: {child}, name: {child.name}, path: {child.path}')
             if child.name == name:
                 return child
-        return None
-
-    async def _get_child_by_path(self, path: str) -> Optional[Union[File, Folder]]:
-        async for child in self._parent.object.children:
-            log.debug(f'searching({path})... child: {child}, name: {child.name}, path: {child.path}')
-            if self._get_path(child) == path:
-                return child
-        return None
+            if found is None and self._get_path(child) == path:
+                found = child
+        return found
 
 
 class FolderInode(BaseFileInode):
     """The class for managing single folder inode."""
+    __slots__ = ('folder',)
+
     def __init__(self, id: int, parent: BaseInode, folder: Folder):
         super(FolderInode, self).__init__(id, parent)
         self.folder = folder
@@ -288,16 +387,12 @@ class FolderInode(BaseFileInode):
     def has_children(self):
         return True
 
-    @property
-    def _is_new_file(self):
-        return False
-
     def _validate(self, object: Union[File, Folder]):
         pass
 
     @property
     def display_path(self):
-        return f'{self.parent.display_path}{self.name}/'
+        return self._get_display_path('/')
 
     @property
     def can_create(self) -> bool:
@@ -306,6 +401,8 @@ class FolderInode(BaseFileInode):
 
 class NewFile:
     """Dummy class for new file."""
+    __slots__ = ('parent', 'name')
+
     def __init__(self, parent: BaseInode, name: str):
         self.parent = parent
         self.name = name
@@ -317,6 +414,7 @@ class NewFile:
 
 class FileInode(BaseFileInode):
     """The class for managing single file inode."""
+    __slots__ = ('file', '_invalidated')
     _invalidated: bool
 
     def __init__(
@@ -327,7 +425,9 @@ class FileInode(BaseFileInode):
     ):
         super(FileInode, self).__init__(id, parent)
         self.file = file
+        self._is_new = isinstance(file, NewFile)
         self._invalidated = False
+        self._cached_size = get_size(file)
 
     def invalidate(self, name: Optional[str] = None):
         super(FileInode, self).invalidate(name=name)
@@ -338,17 +438,26 @@ class FileInode(BaseFileInode):
             # New file and not invalidated(=not written) -> no need to refresh
             return
         await super(FileInode, self).refresh(context, force=force)
+
+    def _set_latest(
+        self,
+        context: 'Inodes',
+        object: Union[File, Folder],
+        loaded_at: Optional[float] = None,
+    ):
         if self._is_new_file:
-            self.file = self._updated
+            # The new file has been uploaded to GRDM
+            context._discard_new_file(self._parent.id, self.file.name, self)
+            # The listing of the parent was loaded before the upload
+            context._cr_discard(self._parent.id)
+            self.file = object
+            self._is_new = False
+        super(FileInode, self)._set_latest(context, object, loaded_at=loaded_at)
 
     @property
     def _original(self):
         return self.file
 
-    @property
-    def _is_new_file(self):
-        return isinstance(self.file, NewFile)
-
     @property
     def name(self):
         if self._is_new_file:
@@ -374,14 +483,8 @@ class FileInode(BaseFileInode):
         return super(FileInode, self).date_modified
 
     @property
-    def size(self) -> Optional[Union[int, str]]:
-        if not hasattr(self._latest, 'size'):
-            return None
-        if self._latest.size is None:
-            return None
-        if type(self._latest.size) != int and type(self._latest.size) != str:
-            return None
-        return self._latest.size
+    def size(self) -> Optional[int]:
+        return self._cached_size
 
     def _validate(self, object: Union[File, Folder]):
         if isinstance(object, Folder):
@@ -389,25 +492,62 @@ class FileInode(BaseFileInode):
 
     @property
     def display_path(self):
-        return f'{self.parent.display_path}{self.name}'
+        return self._get_display_path('')
+
+
+def get_object_path(object: Any) -> str:
+    """Get the path of the object in the storage."""
+    try:
+        return object.osf_path
+    except AttributeError:
+        return object.path
+
+
+def get_path_for(parent: BaseInode, object: Union[Storage, File, Folder, NewFile]) -> str:
+    """Get the path of the inode for the object without creating the inode."""
+    if isinstance(parent, ProjectInode):
+        # Storage
+        return f'{parent.path}{object.name}/'
+    if isinstance(object, NewFile):
+        return object.path
+    path = get_object_path(object)
+    if path.startswith('/'):
+        path = path[1:]
+    return f'{parent.storage.path}{path}'
 
 
 class ChildRelation:
     """The class for managing child relations."""
-    def __init__(self, parent: BaseInode, children: List[BaseInode]):
-        """Initialize ChildRelation object."""
+    __slots__ = ('parent', 'children', 'by_name', 'objects', 'loaded_at')
+
+    def __init__(
+        self,
+        parent: BaseInode,
+        children: List[BaseInode],
+        objects: Optional[Dict[str, Union[Storage, File, Folder]]] = None,
+    ):
+        """Initialize ChildRelation object.
+
+        objects is the mapping from names to the remote objects which the children were created from."""
         self.parent = parent
         self.children = children
+        self.by_name = {c.name: c for c in children}
+        self.objects = objects or {}
+        self.loaded_at = time.monotonic()
 
 
 class Inodes:
     """The class for managing multiple inodes."""
-    INODE_DUMMY = -1
     osf: OSF
     project: str
     osfproject: Optional[Project]
     _inodes: Dict[int, BaseInode]
-    _child_relations: Cache
+    _by_path: Dict[str, BaseInode]
+    _paths: Dict[int, str]
+    _new_files: Dict[int, Dict[str, 'FileInode']]
+    _child_relations: 'OrderedDict[int, Tuple[float, ChildRelation]]'
+    _neg_cache: 'OrderedDict[int, OrderedDict[str, float]]'
+    _listings: 'Dict[int, asyncio.Task[ChildRelation]]'
 
     def __init__(self, osf: OSF, project: str):
         """Initialize Inodes object."""
@@ -415,22 +555,36 @@ class Inodes:
         self.osf = osf
         self.project = project
         self.osfproject = None
+        self._osfproject_lock = asyncio.Lock()
         self.offset_inode = pyfuse3.ROOT_INODE + 1
         self._inodes = {}
-        self._child_relations = Cache(maxsize=256, ttl=LIST_CACHE_TTL, timer=time.time, default=None)
+        self._by_path = {}
+        self._paths = {}
+        self._next_inode = self.offset_inode
+        self._new_files = {}
+        self._child_relations = OrderedDict()
+        self._neg_cache = OrderedDict()
+        self._neg_size = 0
+        self._listings = {}
 
     async def _get_osfproject(self):
         """Get OSF project object."""
         if self.osfproject is not None:
             return self.osfproject
-        self.osfproject = await self.osf.project(self.project)
+        # Concurrent requests on mount share a single request to GRDM
+        async with self._osfproject_lock:
+            if self.osfproject is None:
+                self.osfproject = await self.osf.project(self.project)
         return self.osfproject
 
     async def register(self, parent_inode: BaseInode, name: str):
         """Register new inode."""
         log.debug(f'register: path={parent_inode}, name={name}')
+        self._neg_discard(parent_inode.id, name)
         newfile = NewFile(parent_inode, name)
         inode = await self._get_object_inode(parent_inode, newfile)
+        if isinstance(inode, FileInode) and inode._is_new_file:
+            self._new_files.setdefault(parent_inode.id, {})[name] = inode
         log.debug(f'registered: inode={inode}')
         return inode
 
@@ -443,8 +597,122 @@ class Inodes:
             if inode not in self._inodes:
                 raise ValueError('Unexpected inode: {}'.format(inode))
             inode = self._inodes[inode]
-        self._child_relations.delete(inode.id)
+        self._cr_discard(inode.id)
+        self._neg_discard(inode.id)
+        # A listing in progress may have missed the change
+        self._listings.pop(inode.id, None)
         inode.invalidate(name=name)
+        if name is not None:
+            # Renamed; index the inode under its new parent
+            self.update_path(inode)
+
+    def remove(self, inode: BaseInode):
+        """Remove inode.
+
+        The inode stays available by its number, since the kernel may still
+        refer to it (e.g. an open file), but is never returned for a name again."""
+        log.debug(f'remove: inode={inode}')
+        inode.remove()
+        if isinstance(inode, FileInode) and inode._is_new_file:
+            self._discard_new_file(inode.parent.id, inode.name, inode)
+        self._drop_path(inode)
+
+    def update_path(self, inode: BaseInode):
+        """Update the path index of the inode.
+
+        This method should be called when the path of the inode is changed."""
+        old_path = self._paths.get(inode.id)
+        new_path = inode.path
+        if old_path == new_path:
+            return
+        if old_path is not None and self._by_path.get(old_path) is inode:
+            del self._by_path[old_path]
+        self._by_path[new_path] = inode
+        self._paths[inode.id] = new_path
+
+    def _drop_path(self, inode: BaseInode):
+        """Remove the inode from the path index."""
+        path = self._paths.pop(inode.id, None)
+        if path is not None and self._by_path.get(path) is inode:
+            del self._by_path[path]
+
+    def _cr_get(self, inode_num: int) -> Optional[ChildRelation]:
+        """Get cached child relation of the inode."""
+        ts, cache = self._child_relations.get(inode_num, (None, None))
+        if ts is None:
+            return None
+        if time.monotonic() - ts >= LIST_CACHE_TTL:
+            del self._child_relations[inode_num]
+            return None
+        self._child_relations.move_to_end(inode_num)
+        return cache
+
+    def _cr_set(self, inode_num: int, cache: ChildRelation):
+        """Cache child relation of the inode.
+
+        The least recently used relation is evicted when the cache is full."""
+        self._child_relations[inode_num] = (time.monotonic(), cache)
+        self._child_relations.move_to_end(inode_num)
+        while len(self._child_relations) > LIST_CACHE_SIZE:
+            self._child_relations.popitem(last=False)
+
+    def _cr_discard(self, inode_num: int):
+        """Forget the cached child relation of the inode."""
+        self._child_relations.pop(inode_num, None)
+
+    def _neg_get(self, inode_num: int, name: str) -> bool:
+        """Check whether the name is known not to exist in the inode."""
+        names = self._neg_cache.get(inode_num)
+        if names is None or name not in names:
+            return False
+        if time.monotonic() - names[name] >= NEGATIVE_CACHE_TTL:
+            self._neg_discard(inode_num, name)
+            return False
+        return True
+
+    def _neg_set(self, inode_num: int, name: str):
+        """Remember that the name does not exist in the inode.
+
+        The oldest name of the least recently updated inode is evicted when the cache is full."""
+        names = self._neg_cache.get(inode_num)
+        if names is None:
+            names = self._neg_cache[inode_num] = OrderedDict()
+        if name not in names:
+            self._neg_size += 1
+        names[name] = time.monotonic()
+        names.move_to_end(name)
+        self._neg_cache.move_to_end(inode_num)
+        while self._neg_size > NEGATIVE_CACHE_SIZE:
+            oldest_num, oldest = next(iter(self._neg_cache.items()))
+            oldest.popitem(last=False)
+            self._neg_size -= 1
+            if not oldest:
+                del self._neg_cache[oldest_num]
+
+    def _neg_discard(self, inode_num: int, name: Optional[str] = None):
+        """Forget the names known not to exist in the inode.
+
+        If name is specified, only the name is forgotten."""
+        if name is None:
+            names = self._neg_cache.pop(inode_num, None)
+            if names is not None:
+                self._neg_size -= len(names)
+            return
+        names = self._neg_cache.get(inode_num)
+        if names is None or names.pop(name, None) is None:
+            return
+        self._neg_size -= 1
+        if not names:
+            del self._neg_cache[inode_num]
+
+    def _discard_new_file(self, parent_id: int, name: str, inode: 'FileInode'):
+        """Remove the inode from the index of new files."""
+        new_files = self._new_files.get(parent_id)
+        if new_files is None or new_files.get(name) is not inode:
+            return
+        del new_files[name]
+        if not new_files:
+            del self._new_files[parent_id]
 
     async def get(self, inode_num: int) -> Optional[BaseInode]:
         """Find inode by inode number."""
@@ -452,6 +720,8 @@ class Inodes:
             return self._inodes[inode_num]
         if inode_num == pyfuse3.ROOT_INODE:
             project = await self._get_osfproject()
+            if inode_num in self._inodes:
+                return self._inodes[inode_num]
             inode = ProjectInode(pyfuse3.ROOT_INODE, project)
             self._inodes[inode_num] = inode
             return inode
@@ -461,69 +731,116 @@ class Inodes:
         """Find inode by name."""
         if not parent.has_children():
             raise pyfuse3.FUSEError(errno.ENOTDIR)
-        cache: Optional[ChildRelation] = self._child_relations.get(parent.id)
+        if self._neg_get(parent.id, name):
+            log.debug(f'find_by_name: negative cache hit, parent={parent}, name={name}')
+            return None
+        cache: Optional[ChildRelation] = self._cr_get(parent.id)
         if cache is not None:
             # Use cache
-            for child in cache.children:
+            child = cache.by_name.get(name)
+            if child is not None:
                 # Refresh child attributes for cached objects - occasionally they may be out of date
                 try:
                     await child.refresh(self)
+                    if child.name == name:
+                        return child
                 except:
                     log.warning(f'Failed to refresh: {child}', exc_info=True)
-                    continue
-                if child.name == name:
-                    return child
+            elif time.monotonic() - cache.loaded_at < NEGATIVE_CACHE_TTL:
+                # The name was not in the listing fetched just now
+                return await self._find_new_file_by_name(parent, name)
         # Request to GRDM
-        found = None
-        children: List[BaseInode] = []
-        async for child in self.get_children_of(parent):
-            children.append(await self._get_object_inode(parent, child))
-            log.debug(f'find_by_name: name={name}, child={child.name}')
-            if child.name == name:
-                found = child
-        cache = ChildRelation(parent, children)
-        self._child_relations.set(parent.id, cache)
+        cache = await self._load_children(parent)
+        found = cache.by_name.get(name)
         if found is not None:
-            return await self._get_object_inode(parent, found)
+            return found
         # Find from new files
-        return await self._find_new_file_by_name(parent, name)
+        new_file_inode = await self._find_new_file_by_name(parent, name)
+        if new_file_inode is None and self._cr_get(parent.id) is cache:
+            # Only a listing that is still current proves the name does not exist
+            self._neg_set(parent.id, name)
+        return new_file_inode
+
+    async def find_by_object(self, parent: BaseInode, object: Union[Storage, File, Folder]) -> BaseInode:
+        """Find inode for the object just listed from GRDM."""
+        cache: Optional[ChildRelation] = self._cr_get(parent.id)
+        if cache is not None and object.name not in cache.by_name:
+            # The cached listing is older than the object
+            self._cr_discard(parent.id)
+        self._neg_discard(parent.id, object.name)
+        inode = await self._get_object_inode(parent, object)
+        self._warmup_inode(inode, object)
+        return inode
+
+    async def _load_children(self, parent: BaseInode) -> ChildRelation:
+        """Load the children of the inode from GRDM and cache them.
+
+        Concurrent requests for the same inode share a single listing."""
+        task = self._listings.get(parent.id)
+        if task is None:
+            task = asyncio.ensure_future(self._list_children(parent))
+            self._listings[parent.id] = task
+            def _done(_):
+                if self._listings.get(parent.id) is task:
+                    del self._listings[parent.id]
+            task.add_done_callback(_done)
+        # A cancelled lookup must not cancel the listing shared with others
+        return await asyncio.shield(task)
+
+    async def _list_children(self, parent: BaseInode) -> ChildRelation:
+        children: List[BaseInode] = []
+        objects: Dict[str, Union[Storage, File, Folder]] = {}
+        async for child in self.get_children_of(parent):
+            inode = await self._get_object_inode(parent, child)
+            self._warmup_inode(inode, child)
+            children.append(inode)
+            objects[child.name] = child
+            log.debug(f'list_children: parent={parent}, child={child.name}')
+        cache = ChildRelation(parent, children, objects)
+        if self._listings.get(parent.id) is asyncio.current_task():
+            # Not superseded by an invalidation while listing
+            self._cr_set(parent.id, cache)
+            self._neg_discard(parent.id)
+        return cache
 
     async def get_children_of(self, parent: BaseInode) -> AsyncGenerator[Union[Storage, File, Folder], None]:
         """Get children of the parent inode."""
         log.debug(f'get_children_of: parent={parent}')
         if not parent.has_children():
             raise pyfuse3.FUSEError(errno.ENOTDIR)
-        if isinstance(parent, ProjectInode):
-            project = parent.object
-            async for storage in project.storages:
-                yield storage
-            return
-        async for child in parent.object.children:
+        async for child in parent.iter_children():
             yield child
 
     async def _get_object_inode(self, parent: BaseInode, object: Union[Storage, File, Folder]) -> BaseInode:
         """Get inode for the object."""
-        dummy_inode = self._create_object_inode(self.INODE_DUMMY, parent, object)
-        for inode in self._inodes.values():
-            if inode.removed:
-                continue
-            if inode.path == dummy_inode.path:
-                return inode
-        new_file_inode = await self._find_new_file_by_name(parent, dummy_inode.name)
+        path = get_path_for(parent, object)
+        existing = self._by_path.get(path)
+        if existing is not None and not existing.removed and existing.path == path:
+            return existing
+        new_file_inode = await self._find_new_file_by_name(parent, object.name)
         if new_file_inode is not None:
             return new_file_inode
-        # Register new inode
-        new_inode = None
-        for inode in range(self.offset_inode, sys.maxsize):
-            if inode not in self._inodes:
-                new_inode = inode
-                break
-        if new_inode is None:
-            raise ValueError('Cannot allocate new inodes')
+        # Register new inode; numbers are never reused as rdmfs does not track kernel lookups
+        new_inode = self._next_inode
+        self._next_inode += 1
         self._inodes[new_inode] = r = self._create_object_inode(new_inode, parent, object)
+        self.update_path(r)
         log.debug(f'new inode: inode={r}')
         return r
 
+    def _warmup_inode(self, inode: BaseInode, object: Union[Storage, File, Folder]):
+        """Update the inode with the object listed from GRDM.
+
+        The following refresh() of the inode does not need to request GRDM until the cache expires."""
+        if not isinstance(inode, BaseFileInode) or inode.object is object:
+            return
+        try:
+            inode._validate(object)
+        except pyfuse3.FUSEError:
+            log.debug(f'Skip warming up: inode={inode}, object={object}', exc_info=True)
+            return
+        inode._set_latest(self, object)
+
     def _create_object_inode(self, inode_num: int, parent: BaseInode, object: Union[Storage, File, Folder]) -> BaseInode:
         """Create inode object for the object."""
         if isinstance(object, Storage):
@@ -534,18 +851,15 @@ class Inodes:
 
     async def _find_new_file_by_name(self, parent: BaseInode, name: str) -> Optional[BaseInode]:
         """Find new file by name."""
-        for inode in self._inodes.values():
-            if inode.removed:
-                continue
-            if not isinstance(inode, FileInode):
-                continue
-            if inode.parent != parent:
-                continue
-            if inode._is_new_file and inode.name == name:
-                # Refresh child attributes for cached objects - occasionally they may be out of date
-                try:
-                    await inode.refresh(self)
-                except:
-                    log.debug(f'Failed to refresh: {inode}', exc_info=True)
-                return inode
-        return None
+        new_files = self._new_files.get(parent.id)
+        if not new_files:
+            return None
+        inode = new_files.get(name)
+        if inode is None or inode.removed:
+            return None
+        # Refresh child attributes for cached objects - occasionally they may be out of date
+        try:
+            await inode.refresh(self)
+        except:
+            log.debug(f'Failed to refresh: {inode}', exc_info=True)
+        return inode
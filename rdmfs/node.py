@@ -101,7 +101,7 @@ class FileContext:
         try:
             object = await self.aiterator.__anext__()
             log.debug('Result: name={}, inode={}'.format(object.name, self.inode))
-            child_inode = await self.context.inodes.find_by_name(self.inode, object.name)
+            child_inode = await self.context.inodes.find_by_object(self.inode, object)
             log.info('Result: name={}, inode={}, child={}'.format(object.name, self.inode, child_inode))
             pyfuse3.readdir_reply(
                 token, object.name.encode('utf8'),
@@ -19,3 +19,17 @@ def test_filehandlers():
     new_fh = fh.get_node_fh('test_3')
     assert new_fh == 1
     assert fh.file_handlers[new_fh] == 'test_3'
+
+
+def test_filehandlers_reuse_lowest_released_fh():
+    fh = FileHandlers()
+    for i in range(4):
+        fh.get_node_fh(f'test_{i}')
+
+    fh.release_fh(3)
+    fh.release_fh(2)
+    fh.release_fh(2)
+
+    assert fh.get_node_fh('test_a') == 2
+    assert fh.get_node_fh('test_b') == 3
+    assert fh.get_node_fh('test_c') == 5
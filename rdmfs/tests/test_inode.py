@@ -1,10 +1,34 @@
+import asyncio
 import pytest
 from mock import MagicMock, patch
 
 import pyfuse3
 
-from rdmfs.inode import Inodes, FolderInode, FileInode, StorageInode
-from .mocks import FutureWrapper, MockProject
+from rdmfs import inode as inode_module
+from rdmfs.inode import Inodes, ProjectInode, FolderInode, FileInode, StorageInode, NewFile, ChildRelation, get_size, get_path_for, fromisoformat
+from .mocks import FutureWrapper, MockProject, MockFile, MockFolder, AsyncIterator, is_folder_mock
+
+
+def _mock_osf():
+    osf = MagicMock()
+    osf.project = MagicMock(side_effect=lambda p: FutureWrapper(MockProject(p)))
+    osf.aclose = lambda: FutureWrapper()
+    return osf
+
+
+def _create_object_inode(i, p, o):
+    if isinstance(p, ProjectInode):
+        return StorageInode(i, p, o)
+    if isinstance(o, NewFile) or not is_folder_mock(o):
+        return FileInode(i, p, o)
+    return FolderInode(i, p, o)
+
+
+@pytest.fixture
+def inodes():
+    # Mocks are not osfclient models, so choose the inode class from the mock
+    with patch.object(Inodes, '_create_object_inode', side_effect=_create_object_inode):
+        yield Inodes(_mock_osf(), 'test')
 
 
 @pytest.mark.asyncio
@@ -35,3 +59,363 @@ async def test_find_by_name(mock_create_object_inode):
 
     file_inode = await inodes.find_by_name(sub_folder_inode, 'b')
     assert file_inode.name == 'b'
+
+
+@pytest.mark.asyncio
+async def test_remove(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    folder_inode = await inodes.find_by_name(storage_inode, 'a')
+    assert await inodes.get(folder_inode.id) is folder_inode
+
+    inodes.remove(folder_inode)
+    assert folder_inode.removed
+    # The kernel may still refer to the removed inode
+    assert await inodes.get(folder_inode.id) is folder_inode
+
+    # The inode number is not given to another entry
+    new_inode = await inodes.register(storage_inode, 'new')
+    assert new_inode.id != folder_inode.id
+    assert await inodes.get(new_inode.id) is new_inode
+
+
+@pytest.mark.asyncio
+async def test_rename_and_remove_keep_kernel_entries(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    folder_inode = await inodes.find_by_name(storage_inode, 'a')
+    file_inode = await inodes.register(storage_inode, 'new.txt')
+
+    # The kernel updates its own entries for renames and removals made through FUSE
+    with patch.object(pyfuse3, 'invalidate_entry_async') as mock_invalidate_entry, \
+        patch.object(pyfuse3, 'invalidate_inode') as mock_invalidate_inode:
+        file_inode.set_parent(folder_inode)
+        inodes.invalidate(file_inode, name='renamed.txt')
+        inodes.invalidate(storage_inode)
+        inodes.invalidate(folder_inode)
+        inodes.remove(folder_inode)
+    mock_invalidate_entry.assert_not_called()
+    mock_invalidate_inode.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rename_keeps_inode(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    file_a = MockFile('/a')
+    file_a.osf_path = '/5f0a'
+    folder_d = MockFolder('/d')
+    folder_d.osf_path = '/5f0d/'
+    storage_inode.object.children = AsyncIterator([file_a, folder_d])
+    file_inode = await inodes.find_by_name(storage_inode, 'a')
+    folder_inode = await inodes.find_by_name(storage_inode, 'd')
+
+    # mv a d/b, then list d before the renamed inode is refreshed
+    file_inode.set_parent(folder_inode)
+    inodes.invalidate(file_inode, name='b')
+    inodes.invalidate(storage_inode)
+    inodes.invalidate(folder_inode)
+    file_b = MockFile('/d/b')
+    file_b.osf_path = '/5f0a'
+    folder_d.children = AsyncIterator([file_b])
+    assert await inodes.find_by_name(folder_inode, 'b') is file_inode
+    assert file_inode.object is file_b
+
+
+@pytest.mark.asyncio
+async def test_find_new_file_by_name(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+
+    new_inode = await inodes.register(storage_inode, 'new.txt')
+    assert isinstance(new_inode.object, NewFile)
+    assert await inodes.find_by_name(storage_inode, 'new.txt') is new_inode
+    assert await inodes.register(storage_inode, 'new.txt') is new_inode
+
+    inodes.remove(new_inode)
+    assert await inodes.find_by_name(storage_inode, 'new.txt') is None
+
+
+@patch.object(inode_module, 'LIST_CACHE_SIZE', 2)
+def test_child_relations_cache():
+    inodes = Inodes(MagicMock(), 'test')
+    relations = [ChildRelation(MagicMock(), []) for _ in range(3)]
+
+    inodes._cr_set(10, relations[0])
+    inodes._cr_set(11, relations[1])
+    # Touch 10 so that 11 becomes the least recently used relation
+    assert inodes._cr_get(10) is relations[0]
+    inodes._cr_set(12, relations[2])
+    assert inodes._cr_get(11) is None
+    assert inodes._cr_get(10) is relations[0]
+    assert inodes._cr_get(12) is relations[2]
+
+    with patch.object(inode_module.time, 'monotonic',
+                      return_value=inode_module.time.monotonic() + inode_module.LIST_CACHE_TTL):
+        assert inodes._cr_get(10) is None
+
+
+@patch.object(inode_module, 'NEGATIVE_CACHE_SIZE', 2)
+def test_negative_cache():
+    inodes = Inodes(MagicMock(), 'test')
+
+    inodes._neg_set(10, 'a')
+    inodes._neg_set(11, 'b')
+    # The oldest name of the least recently updated inode is evicted
+    inodes._neg_set(11, 'c')
+    assert not inodes._neg_get(10, 'a')
+    assert inodes._neg_get(11, 'b')
+    assert inodes._neg_get(11, 'c')
+
+    inodes._neg_discard(11, 'b')
+    assert not inodes._neg_get(11, 'b')
+    assert inodes._neg_get(11, 'c')
+    inodes._neg_set(12, 'd')
+    inodes._neg_discard(11)
+    assert not inodes._neg_get(11, 'c')
+    assert inodes._neg_get(12, 'd')
+
+    with patch.object(inode_module.time, 'monotonic',
+                      return_value=inode_module.time.monotonic() + inode_module.NEGATIVE_CACHE_TTL):
+        assert not inodes._neg_get(12, 'd')
+
+
+def test_get_size():
+    assert get_size(MagicMock(size=1024)) == 1024
+    assert get_size(MagicMock(size='1024')) == 1024
+    assert get_size(MagicMock(size='unknown')) is None
+    assert get_size(MagicMock(size=None)) is None
+    assert get_size(MagicMock(spec=[])) is None
+
+
+@pytest.mark.asyncio
+async def test_get_root_concurrently():
+    async def _project(p):
+        # Yield to other tasks as the real request does
+        await asyncio.sleep(0)
+        return MockProject(p)
+    MockOSF = _mock_osf()
+    MockOSF.project = MagicMock(side_effect=_project)
+
+    inodes = Inodes(MockOSF, 'test')
+    root_inodes = await asyncio.gather(*[inodes.get(pyfuse3.ROOT_INODE) for _ in range(3)])
+
+    assert all(inode is root_inodes[0] for inode in root_inodes)
+    MockOSF.project.assert_called_once_with('test')
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_warms_up_children(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+
+    folder_a = MockFolder('/a')
+    folder_a.osf_path = '/a/'
+    storage_inode.object.children = AsyncIterator([folder_a])
+    folder_inode = await inodes.find_by_name(storage_inode, 'a')
+    assert folder_inode.object is folder_a
+    folder_inode.invalidate()
+
+    # Listing the storage again updates the existing inode
+    latest_folder_a = MockFolder('/a')
+    latest_folder_a.osf_path = '/a/'
+    storage_inode.object.children = AsyncIterator([latest_folder_a])
+    inodes.invalidate(storage_inode)
+    assert await inodes.find_by_name(storage_inode, 'a') is folder_inode
+    assert folder_inode.object is latest_folder_a
+
+    # The warmed up attributes are fresh, so refresh does not reload them
+    storage_inode.object.children = AsyncIterator([])
+    await folder_inode.refresh(inodes)
+    assert folder_inode.object is latest_folder_a
+
+
+@pytest.mark.asyncio
+async def test_refresh_from_parent_listing(inodes):
+    clock = [1000.0]
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    old_file = MockFile('/f.txt')
+    old_file.size = 1
+    async def _get_children_of(parent):
+        yield old_file
+        # Listing a large folder takes a while
+        clock[0] += 10
+
+    with patch.object(inode_module.time, 'monotonic', side_effect=lambda: clock[0]):
+        with patch.object(inodes, 'get_children_of', side_effect=_get_children_of):
+            file_inode = await inodes.find_by_name(storage_inode, 'f.txt')
+        assert file_inode.size == 1
+        new_file = MockFile('/f.txt')
+        new_file.size = 2
+        storage_inode.object.children = AsyncIterator([new_file])
+
+        # The attributes expired but the listing of the parent is still fresh
+        clock[0] += inode_module.FILE_ATTRIBUTE_CACHE_TTL - 5
+        await file_inode.refresh(inodes)
+        assert file_inode.size == 1
+
+        # The file was written; the listing of the parent predates it
+        inodes.invalidate(file_inode)
+        await file_inode.refresh(inodes)
+        assert file_inode.size == 2
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_negative_cache(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    assert await inodes.find_by_name(storage_inode, 'x') is None
+
+    folder_x = MockFolder('/x')
+    folder_x.osf_path = '/x/'
+    storage_inode.object.children = AsyncIterator([folder_x])
+    # The missing name is served from the negative cache
+    assert await inodes.find_by_name(storage_inode, 'x') is None
+
+    inodes.invalidate(storage_inode)
+    folder_inode = await inodes.find_by_name(storage_inode, 'x')
+    assert folder_inode.name == 'x'
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_uploaded_file(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    new_inode = await inodes.register(storage_inode, 'new.txt')
+    assert await inodes.find_by_name(storage_inode, 'x') is None
+
+    # Upload the new file and let the inode load it
+    uploaded = MockFile('/new.txt')
+    storage_inode.object.children = AsyncIterator([uploaded])
+    inodes.invalidate(new_inode)
+    await new_inode.refresh(inodes)
+    assert new_inode.object is uploaded
+
+    assert await inodes.find_by_name(storage_inode, 'new.txt') is new_inode
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_shares_listing(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage = MagicMock()
+    storage.name = 'osfstorage'
+    calls = []
+    async def _get_children_of(parent):
+        calls.append(parent)
+        await asyncio.sleep(0)
+        yield storage
+
+    with patch.object(inodes, 'get_children_of', side_effect=_get_children_of):
+        results = await asyncio.gather(
+            inodes.find_by_name(project_inode, 'osfstorage'),
+            inodes.find_by_name(project_inode, 'osfstorage'),
+        )
+    assert results[0] is results[1]
+    assert results[0].name == 'osfstorage'
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_after_invalidate_during_listing(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage = MagicMock()
+    storage.name = 'osfstorage'
+    gate = asyncio.Event()
+    calls = []
+    async def _get_children_of(parent):
+        calls.append(parent)
+        if len(calls) == 1:
+            # Listed before the storage was created
+            await gate.wait()
+            return
+        yield storage
+
+    with patch.object(inodes, 'get_children_of', side_effect=_get_children_of):
+        stale = asyncio.ensure_future(inodes.find_by_name(project_inode, 'osfstorage'))
+        while not calls:
+            await asyncio.sleep(0)
+        # The storage is created, as mkdir does before looking it up
+        inodes.invalidate(project_inode)
+        # Must not wait for the listing started before the invalidation
+        storage_inode = await asyncio.wait_for(inodes.find_by_name(project_inode, 'osfstorage'), 1)
+        assert storage_inode.name == 'osfstorage'
+
+        gate.set()
+        assert await stale is None
+        # The superseded listing does not hide the storage
+        assert await inodes.find_by_name(project_inode, 'osfstorage') is storage_inode
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_find_by_name_fresh_listing(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    assert await inodes.find_by_name(storage_inode, 'x') is None
+
+    folder_y = MockFolder('/y')
+    folder_y.osf_path = '/y/'
+    storage_inode.object.children = AsyncIterator([folder_y])
+    # The missing name is answered from the listing fetched just now
+    assert await inodes.find_by_name(storage_inode, 'y') is None
+    new_inode = await inodes.register(storage_inode, 'new.txt')
+    assert await inodes.find_by_name(storage_inode, 'new.txt') is new_inode
+
+    with patch.object(inode_module.time, 'monotonic',
+                      return_value=inode_module.time.monotonic() + inode_module.NEGATIVE_CACHE_TTL):
+        folder_inode = await inodes.find_by_name(storage_inode, 'y')
+    assert folder_inode.name == 'y'
+
+
+@pytest.mark.asyncio
+async def test_get_path_for(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage = MagicMock()
+    storage.name = 'osfstorage'
+    storage_inode = StorageInode(2, project_inode, storage)
+    assert get_path_for(project_inode, storage) == storage_inode.path
+
+    folder = MockFolder('/a')
+    folder.osf_path = '/a/'
+    folder_inode = FolderInode(3, storage_inode, folder)
+    assert get_path_for(storage_inode, folder) == folder_inode.path
+
+    newfile = NewFile(folder_inode, 'new.txt')
+    assert get_path_for(folder_inode, newfile) == FileInode(4, folder_inode, newfile).path
+
+
+@pytest.mark.asyncio
+async def test_display_path_cache(inodes):
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage = MagicMock()
+    storage.name = 'osfstorage'
+    storage_inode = StorageInode(2, project_inode, storage)
+    folder = MockFolder('/a')
+    folder.osf_path = '/a/'
+    folder_inode = FolderInode(3, storage_inode, folder)
+
+    display_path = folder_inode.display_path
+    assert display_path == '/osfstorage/a/'
+    assert folder_inode.display_path is display_path
+
+    folder_inode.invalidate(name='b')
+    assert folder_inode.display_path == '/osfstorage/b/'
+
+
+def test_inodes_have_no_instance_dict():
+    parent = MagicMock()
+    inode = FileInode(3, parent, NewFile(parent, 'new.txt'))
+    assert not hasattr(inode, '__dict__')
+    assert not hasattr(inode.file, '__dict__')
+    assert not hasattr(ChildRelation(parent, [inode]), '__dict__')
+
+
+def test_fromisoformat():
+    assert fromisoformat('2024-01-02T03:04:05.123456Z') == 1704164645123456000
+    assert fromisoformat('2024-01-02T03:04:05.123456+00:00') == 1704164645123456000
+    # Parsed timestamps are served without parsing again
+    with patch.object(inode_module, 'datetime') as mock_datetime:
+        assert fromisoformat('2024-01-02T03:04:05.123456Z') == 1704164645123456000
+        mock_datetime.fromisoformat.assert_not_called()
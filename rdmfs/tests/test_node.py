@@ -4,7 +4,7 @@ from mock import MagicMock, AsyncMock, patch
 import pyfuse3
 
 from rdmfs.inode import Inodes, FolderInode, FileInode, StorageInode
-from .mocks import FutureWrapper, MockProject, MockFolder
+from .mocks import FutureWrapper, MockProject, MockFolder, AsyncIterator
 from rdmfs.node import FileContext
 
 
@@ -109,3 +109,87 @@ async def test_readdir_from_storage(
             'text': 'test metadata'
         }, 3
     )
+
+
+@pytest.mark.asyncio
+@patch.object(Inodes, '_create_object_inode')
+@patch.object(pyfuse3, 'readdir_reply')
+async def test_readdir_after_remote_change(
+    mock_readdir_reply, mock_create_object_inode
+):
+    MockOSF = MagicMock()
+    MockOSF.project = MagicMock(side_effect=lambda p: FutureWrapper(MockProject(p)))
+    MockOSF.aclose = lambda: FutureWrapper()
+    def _create_object_inode(i, p, o):
+        if o.name.startswith('Folder-'):
+            return FolderInode(i, p, o)
+        if o.name.startswith('File-'):
+            return FileInode(i, p, o)
+        return StorageInode(i, p, o)
+    mock_create_object_inode.side_effect = _create_object_inode
+
+    inodes = Inodes(MockOSF, 'test')
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    assert (await inodes.find_by_name(storage_inode, 'a')).name == 'a'
+
+    # Another client adds a folder while the listing is cached
+    storage_inode.object.children = AsyncIterator([MockFolder('/a'), MockFolder('/y')])
+
+    context = MagicMock()
+    context.inodes = inodes
+    context.getattr = AsyncMock(return_value={
+        'text': 'test metadata'
+    })
+    fc = FileContext(context, storage_inode)
+    await fc.readdir(0, 'token_a')
+    await fc.readdir(1, 'token_b')
+
+    mock_readdir_reply.assert_called_with(
+        'token_b', b'y', {
+            'text': 'test metadata'
+        }, 2
+    )
+    assert (await inodes.find_by_name(storage_inode, 'y')).name == 'y'
+
+
+@pytest.mark.asyncio
+@patch.object(Inodes, '_create_object_inode')
+@patch.object(pyfuse3, 'readdir_reply')
+async def test_readdir_after_failed_lookup(
+    mock_readdir_reply, mock_create_object_inode
+):
+    MockOSF = MagicMock()
+    MockOSF.project = MagicMock(side_effect=lambda p: FutureWrapper(MockProject(p)))
+    MockOSF.aclose = lambda: FutureWrapper()
+    def _create_object_inode(i, p, o):
+        if o.name.startswith('Folder-'):
+            return FolderInode(i, p, o)
+        if o.name.startswith('File-'):
+            return FileInode(i, p, o)
+        return StorageInode(i, p, o)
+    mock_create_object_inode.side_effect = _create_object_inode
+
+    inodes = Inodes(MockOSF, 'test')
+    project_inode = await inodes.get(pyfuse3.ROOT_INODE)
+    storage_inode = await inodes.find_by_name(project_inode, 'osfstorage')
+    assert await inodes.find_by_name(storage_inode, 'y') is None
+
+    # Another client adds the missing folder
+    storage_inode.object.children = AsyncIterator([MockFolder('/a'), MockFolder('/y')])
+
+    context = MagicMock()
+    context.inodes = inodes
+    context.getattr = AsyncMock(return_value={
+        'text': 'test metadata'
+    })
+    fc = FileContext(context, storage_inode)
+    await fc.readdir(0, 'token_a')
+    await fc.readdir(1, 'token_b')
+
+    mock_readdir_reply.assert_called_with(
+        'token_b', b'y', {
+            'text': 'test metadata'
+        }, 2
+    )
+    assert (await inodes.find_by_name(storage_inode, 'y')).name == 'y'